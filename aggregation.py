@@ -0,0 +1,73 @@
+import pandas as pd
+
+MONTHS_IN_PERIOD = {"year": 12, "quarter": 3}
+
+
+def add_period_totals(
+    df_months: pd.DataFrame,
+    value_col: str,
+    quarterly: bool = False,
+    decimals: int | None = None,
+) -> pd.DataFrame:
+    """Добавляет к помесячным строкам годовые (и квартальные) суммы.
+
+    Итог за период добавляется только при наличии всех месяцев периода.
+    Группировка идёт по всем колонкам, кроме PERIOD, PERIOD_TYPE и value_col,
+    поэтому LOAD_DATE, PACKAGE_ID и TYPE_DESCRIPTION переносятся в итоговые
+    строки без изменений. Возвращает помесячные строки вместе с итогами.
+    """
+    if df_months.empty:
+        return df_months
+
+    is_datetime = pd.api.types.is_datetime64_any_dtype(df_months["PERIOD"])
+    periods = pd.to_datetime(df_months["PERIOD"])
+    keys = [
+        col
+        for col in df_months.columns
+        if col not in ("PERIOD", "PERIOD_TYPE", value_col)
+    ]
+
+    base = df_months[keys + [value_col]].assign(
+        YEAR=periods.dt.year.to_numpy(),
+        QUARTER=periods.dt.quarter.to_numpy(),
+        MONTH=periods.dt.month.to_numpy(),
+    )
+
+    rollups = {"year": ["YEAR"]}
+    if quarterly:
+        rollups["quarter"] = ["YEAR", "QUARTER"]
+
+    frames = [df_months]
+    for period_type, period_keys in rollups.items():
+        totals = base.groupby(keys + period_keys, sort=False, dropna=False).agg(
+            MONTHS=("MONTH", "nunique"), TOTAL=(value_col, "sum")
+        )
+        totals = totals[totals["MONTHS"] == MONTHS_IN_PERIOD[period_type]]
+        if totals.empty:
+            continue
+        totals = totals.reset_index()
+
+        end_month = totals["QUARTER"] * 3 if "QUARTER" in totals else 12
+        period_end = pd.to_datetime(
+            pd.DataFrame({"year": totals["YEAR"], "month": end_month, "day": 1})
+        ) + pd.offsets.MonthEnd(0)
+
+        value = totals["TOTAL"]
+        if decimals is not None:
+            value = value.round(decimals)
+
+        frames.append(
+            totals[keys].assign(
+                **{
+                    value_col: value,
+                    "PERIOD": (
+                        period_end
+                        if is_datetime
+                        else period_end.dt.strftime("%Y-%m-%d")
+                    ),
+                    "PERIOD_TYPE": period_type,
+                }
+            )[df_months.columns]
+        )
+
+    return pd.concat(frames, ignore_index=True)
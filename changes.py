@@ -0,0 +1,148 @@
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import loader_settings
+from filestore import read_parquet, write_parquet
+
+logger = logging.getLogger(__name__)
+
+SERVICE_COLUMNS = ("LOAD_DATE", "PACKAGE_ID")
+
+
+def _path(name):
+    return Path(loader_settings.cache_dir) / "fingerprints" / f"{name}.parquet"
+
+
+def key_columns(spec):
+    """Ключ ячейки витрины: период (и тип периода) и TYPE."""
+    return [c for c in ("PERIOD", "PERIOD_TYPE", "TYPE") if c in spec.columns]
+
+
+def _period_columns(spec):
+    return [c for c in key_columns(spec) if c != "TYPE"]
+
+
+def cell_keys(spec, df):
+    """Ключи ячеек строк df в одном виде (PERIOD — строка YYYY-MM-DD)."""
+    keys = pd.DataFrame(
+        {"PERIOD": pd.to_datetime(df["PERIOD"]).dt.strftime("%Y-%m-%d")},
+        index=df.index,
+    )
+    if "PERIOD_TYPE" in spec.columns:
+        keys["PERIOD_TYPE"] = df["PERIOD_TYPE"].astype(str)
+    keys["TYPE"] = df["TYPE"].astype("int64")
+    return keys
+
+
+def fingerprint(spec, df):
+    """Ключи ячеек и хэш CELL_HASH от ключа и значений строки.
+
+    Значения приводятся к одному виду, чтобы строки из отчёта, снимка
+    и Vertica с одинаковыми данными давали одинаковый хэш.
+    """
+    numeric = {spec.value_col} | ({spec.rates.column} if spec.rates else set())
+    keys = cell_keys(spec, df)
+    values = pd.DataFrame(
+        {
+            c: (
+                pd.to_numeric(df[c], errors="coerce").astype(float).round(6)
+                if c in numeric
+                else df[c].fillna("").astype(str)
+            )
+            for c in spec.columns
+            if c not in SERVICE_COLUMNS and c not in keys
+        },
+        index=df.index,
+    )
+    return keys.assign(
+        CELL_HASH=pd.util.hash_pandas_object(keys.join(values), index=False)
+    )
+
+
+def period_fingerprints(spec, cells):
+    """Отпечаток периода — XOR хэшей его ячеек (не зависит от порядка строк)."""
+    return (
+        cells.groupby(_period_columns(spec))["CELL_HASH"]
+        .agg(np.bitwise_xor.reduce)
+        .rename("PERIOD_HASH")
+        .reset_index()
+    )
+
+
+def _new_rows(left, right, on):
+    """Строки left, для которых нет строки right с теми же значениями on."""
+    merged = left.merge(right[on].drop_duplicates(), on=on, how="left", indicator=True)
+    return merged[merged["_merge"] == "left_only"].drop(columns="_merge")
+
+
+def load_fingerprints(spec):
+    """Отпечатки последней загрузки каждой ячейки или None."""
+    return read_parquet(_path(spec.name))
+
+
+def save_fingerprints(spec, store):
+    write_parquet(_path(spec.name), store)
+
+
+def detect_changes(spec, df):
+    """Строки df, которые отличаются от последней загрузки (дельта).
+
+    Сначала сравниваются отпечатки периодов, ячейки проверяются только
+    в изменившихся и новых периодах. Без сохранённых отпечатков дельта —
+    весь набор. Ячейки, которых нет в df (например, на карантине),
+    не удаляются.
+    """
+    previous = load_fingerprints(spec)
+    if previous is None:
+        logger.info(f"[{spec.name}] Отпечатков нет, загружается весь набор.")
+        return df
+
+    current = fingerprint(spec, df)
+    keys, periods = key_columns(spec), _period_columns(spec)
+    stale = _new_rows(
+        period_fingerprints(spec, current),
+        period_fingerprints(spec, previous),
+        [*periods, "PERIOD_HASH"],
+    )
+    candidates = current.reset_index().merge(stale[periods], on=periods)
+    changed = _new_rows(candidates, previous, [*keys, "CELL_HASH"])
+    revised = len(changed) - len(_new_rows(changed, previous, keys))
+    logger.info(
+        f"[{spec.name}] Изменились периоды: {len(stale)}, строк в дельте: "
+        f"{len(changed)} (из них пересмотрено: {revised})"
+    )
+    return df.loc[changed["index"]]
+
+
+def apply_delta(spec, df, changed, package_id):
+    """Отпечатки после загрузки дельты changed под package_id.
+
+    Возвращает (df с PACKAGE_ID последней загрузки каждой ячейки, отпечатки).
+    Отпечатки сохраняются отдельно (save_fingerprints) — после того как
+    обновлена локальная копия, иначе следующий запуск не увидит дельту.
+    """
+    keys = key_columns(spec)
+    loaded = fingerprint(spec, changed).assign(PACKAGE_ID=package_id)
+    previous = load_fingerprints(spec)
+    if previous is not None:
+        loaded = pd.concat([previous, loaded], ignore_index=True).drop_duplicates(
+            keys, keep="last"
+        )
+    package_ids = fingerprint(spec, df)[keys].merge(
+        loaded[[*keys, "PACKAGE_ID"]], on=keys, how="left"
+    )["PACKAGE_ID"]
+    current = df.assign(
+        PACKAGE_ID=package_ids.fillna(package_id).astype("int64").values
+    )
+    return current, loaded
+
+
+def rebuild_fingerprints(spec, df):
+    """Пересобирает отпечатки по текущему состоянию витрины (с PACKAGE_ID)."""
+    save_fingerprints(
+        spec, fingerprint(spec, df).assign(PACKAGE_ID=df["PACKAGE_ID"].values)
+    )
+    logger.info(f"[{spec.name}] Отпечатки пересобраны: {len(df)} ячеек")
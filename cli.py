@@ -0,0 +1,290 @@
+import argparse
+import logging
+import os
+import time
+
+from specs import SPECS
+
+STARTED = time.perf_counter()
+
+LOG_FORMAT = (
+    "[%(asctime)s.%(msecs)03d] %(module)s:%(lineno)d %(levelname)s - %(message)s"
+)
+
+PROFILE_HELP = "профилировать этапы (cProfile), также LENDING__PROFILE=1"
+FULL_LOAD_HELP = "загрузить весь набор, а не только изменившиеся ячейки"
+
+logger = logging.getLogger(__name__)
+
+
+def setup_logging(names):
+    os.makedirs("logs", exist_ok=True)
+    suffix = names[0] if len(names) == 1 else "all"
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        datefmt="%Y-%m-%d %H:%M",
+        filename=f"logs/lending-{suffix}.log",
+        encoding="utf-8",
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="Загрузка витрин D_LENDING_* из отчётов НБ РК."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="сбор, разбор и загрузка витрин")
+    run.add_argument(
+        "marts",
+        nargs="*",
+        metavar="MART",
+        help=f"витрины ({', '.join(SPECS)}); по умолчанию все",
+    )
+    run.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="только разбор и проверка, без подключения к Vertica",
+    )
+    run.add_argument("--workers", type=int, help="число параллельных отчётов")
+    run.add_argument(
+        "--full-crawl",
+        action="store_true",
+        help="обойти все страницы рубрик, а не только до известных ссылок",
+    )
+    run.add_argument("--profile", action="store_true", help=PROFILE_HELP)
+    run.add_argument("--full-load", action="store_true", help=FULL_LOAD_HELP)
+
+    load_only = commands.add_parser(
+        "load-only", help="повторная загрузка сохранённого снимка без сбора отчётов"
+    )
+    load_only.add_argument(
+        "marts",
+        nargs="*",
+        metavar="MART",
+        help="витрины; по умолчанию все (берётся последний снимок)",
+    )
+    load_only.add_argument(
+        "--snapshot", help="путь к снимку .parquet (для одной витрины)"
+    )
+    load_only.add_argument("--profile", action="store_true", help=PROFILE_HELP)
+    load_only.add_argument("--full-load", action="store_true", help=FULL_LOAD_HELP)
+
+    query = commands.add_parser(
+        "query", help="чтение витрины из локальной копии (CSV в stdout)"
+    )
+    query.add_argument("mart", choices=list(SPECS))
+    query.add_argument("--from", dest="period_from", help="с периода YYYY-MM-DD")
+    query.add_argument("--to", dest="period_to", help="по период YYYY-MM-DD")
+    query.add_argument(
+        "--type", dest="types", type=int, action="append", help="TYPE (повторяемый)"
+    )
+    query.add_argument(
+        "--period-type",
+        default="month",
+        help="month/year; 'all' — без фильтра (для витрин с PERIOD_TYPE)",
+    )
+
+    refresh = commands.add_parser(
+        "cache-refresh", help="заполнить локальную копию последним пакетом из Vertica"
+    )
+    refresh.add_argument("marts", nargs="*", metavar="MART")
+
+    accept = commands.add_parser(
+        "accept", help="принять проблему проверки: период не уйдёт на карантин"
+    )
+    accept.add_argument("mart", choices=list(SPECS))
+    accept.add_argument("period", help="период YYYY-MM-DD")
+    accept.add_argument(
+        "--check", default="outlier", help="проверка (по умолчанию outlier)"
+    )
+    return parser
+
+
+def report(results, timings, changed=None):
+    """Итог запуска: строки по витринам (и дельта загрузки), время этапов,
+    ожидание ресурсов и самые затратные функции, если включено профилирование."""
+    from governor import governor
+    from profiling import profiler
+
+    changed = changed or {}
+    lines = []
+    for name, df in results.items():
+        line = f"{name}: {len(df)} строк"
+        if len(df):
+            line += f", периоды {df['PERIOD'].min()} .. {df['PERIOD'].max()}"
+        if name in changed:
+            line += f", загружено изменённых {changed[name]}"
+        lines.append(line)
+    lines.append(" ".join(f"{stage}_s={sec:.3f}" for stage, sec in timings.items()))
+    for resource, stats in governor.stats().items():
+        lines.append(
+            f"{resource}: limit={stats['limit']} acquired={stats['acquired']} "
+            f"wait_s={stats['wait_s']:.3f} max_wait_s={stats['max_wait_s']:.3f} "
+            f"queue={stats['queue']}"
+        )
+    lines.extend(profiler.save())
+    for line in lines:
+        logger.info(line)
+        print(line)
+
+
+def fail_if_missing(names, results):
+    """Завершает процесс с ненулевым кодом, если по витрине нет данных."""
+    missing = [name for name in names if name not in results]
+    if missing:
+        message = f"Нет данных по витринам: {', '.join(missing)}"
+        logger.error(message)
+        raise SystemExit(message)
+
+
+def load_and_publish(spec, df, package_id, full=False):
+    """Загрузка в Vertica изменившихся ячеек (или всего набора при full).
+
+    При полном успехе обновляет локальную копию витрины и затем запоминает
+    отпечатки ячеек. Возвращает число строк в дельте.
+    """
+    from changes import apply_delta, detect_changes, save_fingerprints
+    from engine import load
+    from marts import publish, updated_state
+
+    changed = df if full else detect_changes(spec, df)
+    if changed.empty:
+        logger.info(f"[{spec.name}] Изменений нет, загрузка пропущена.")
+        return 0
+    package_id, failed_rows = load(spec, changed, package_id)
+    if failed_rows:
+        logger.warning(f"[{spec.name}] Локальная копия не обновлена: есть ошибки.")
+    else:
+        current, fingerprints = apply_delta(spec, df, changed, package_id)
+        delta = changed.assign(PACKAGE_ID=package_id)
+        publish(spec, updated_state(spec, current, delta), package_id)
+        save_fingerprints(spec, fingerprints)
+    return len(changed)
+
+
+def cmd_run(args):
+    from engine import extract, next_package_id
+    from profiling import profiler
+    from snapshots import save_snapshot
+    from validation import save_quarantine, validate
+
+    specs = [SPECS[name] for name in args.marts or SPECS]
+    timings = {"startup": time.perf_counter() - STARTED}
+
+    package_ids, changed = {}, {}
+    if not args.dry_run:
+        package_ids = {spec.name: next_package_id(spec) for spec in specs}
+
+    started = time.perf_counter()
+    results = extract(specs, args.workers, args.full_crawl)
+    timings["extract"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for spec in specs:
+        if spec.name not in results:
+            continue
+        with profiler.stage("validate"):
+            good, quarantined, issues = validate(spec, results[spec.name])
+        if len(quarantined):
+            save_quarantine(spec, quarantined, issues)
+        results[spec.name] = good
+    timings["validate"] = time.perf_counter() - started
+
+    if not args.dry_run:
+        started = time.perf_counter()
+        loaded = [spec for spec in specs if len(results.get(spec.name, ()))]
+        for spec in loaded:
+            save_snapshot(spec, results[spec.name], package_ids[spec.name])
+        for spec in loaded:
+            with profiler.stage("load"):
+                changed[spec.name] = load_and_publish(
+                    spec, results[spec.name], package_ids[spec.name], args.full_load
+                )
+        timings["load"] = time.perf_counter() - started
+
+    timings["total"] = time.perf_counter() - STARTED
+    report(results, timings, changed)
+    fail_if_missing([spec.name for spec in specs], results)
+
+
+def cmd_load_only(args):
+    from profiling import profiler
+    from snapshots import latest_snapshot, read_snapshot
+
+    names = args.marts or list(SPECS)
+    if args.snapshot and len(names) != 1:
+        raise SystemExit("--snapshot указывается для одной витрины")
+
+    results, changed = {}, {}
+    timings = {"startup": time.perf_counter() - STARTED}
+    started = time.perf_counter()
+    for name in names:
+        path = args.snapshot or latest_snapshot(name)
+        if not path:
+            logger.error(f"[{name}] Снимок не найден.")
+            continue
+        df, package_id = read_snapshot(path)
+        logger.info(f"[{name}] Загрузка снимка {path} (PACKAGE_ID {package_id})")
+        with profiler.stage("load"):
+            changed[name] = load_and_publish(
+                SPECS[name], df, package_id, args.full_load
+            )
+        results[name] = df
+    timings["load"] = time.perf_counter() - started
+    timings["total"] = time.perf_counter() - STARTED
+    report(results, timings, changed)
+    fail_if_missing(names, results)
+
+
+def cmd_query(args):
+    import sys
+
+    from marts import read_mart
+
+    period_type = None if args.period_type == "all" else args.period_type
+    df = read_mart(args.mart, args.period_from, args.period_to, args.types, period_type)
+    df.to_csv(sys.stdout, index=False)
+
+
+def cmd_accept(args):
+    from validation import accept_issue
+
+    accept_issue(args.mart, args.period, args.check)
+
+
+def cmd_cache_refresh(args):
+    from marts import refresh_from_vertica
+
+    for name in args.marts or SPECS:
+        package_id = refresh_from_vertica(SPECS[name])
+        print(f"{name}: PACKAGE_ID {package_id}")
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    marts = args.marts if "marts" in args else [args.mart]
+    unknown = set(marts) - set(SPECS)
+    if unknown:
+        parser.error(f"неизвестные витрины: {', '.join(sorted(unknown))}")
+    setup_logging(marts or list(SPECS))
+    if args.command in ("run", "load-only"):
+        from config import loader_settings
+        from profiling import profiler
+
+        if args.profile or loader_settings.profile:
+            profiler.enable(marts[0] if len(marts) == 1 else "all")
+    commands = {
+        "run": cmd_run,
+        "load-only": cmd_load_only,
+        "query": cmd_query,
+        "cache-refresh": cmd_cache_refresh,
+        "accept": cmd_accept,
+    }
+    commands[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ class VerticaSettings(BaseSettings):
     host: str = "localhost"
     port: int = 5433
     database: str = ""
+    resource_pool: str = ""
 
     @property
     def conn_info(self) -> dict:
@@ -30,3 +31,33 @@ class VerticaSettings(BaseSettings):
 
 
 settings = VerticaSettings()
+
+
+class LoaderSettings(BaseSettings):
+    """Настройки загрузчиков витрин."""
+
+    workers: int = 4
+    download_dir: str = "downloads"
+    download_chunk_size: int = 256 * 1024
+    spool_ram_budget: int = 8 * 1024 * 1024
+    snapshot_dir: str = "snapshots"
+    cache_dir: str = "cache"
+    max_listing_pages: int = 50
+    quarantine_dir: str = "quarantine"
+    outlier_ratio: float = 10.0
+    lock_dir: str = "locks"
+    http_per_host: int = 4
+    parse_workers: int = 0
+    parse_ram_budget_mb: int = 2048
+    parse_ram_per_worker_mb: int = 512
+    vertica_sessions: int = 2
+    slot_timeout: float = 0.0
+    profile: bool = False
+    profile_dir: str = "logs/profiles"
+    profile_top: int = 10
+
+    class Config:
+        env_prefix = "LENDING__"
+
+
+loader_settings = LoaderSettings()
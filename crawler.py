@@ -0,0 +1,142 @@
+import logging
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qs, urljoin, urlparse
+
+import lxml.html
+import requests
+
+from config import loader_settings
+from filestore import read_json, update_json
+from governor import governor
+
+logger = logging.getLogger(__name__)
+
+
+class LinkIndex:
+    """Индекс ссылок на отчёты, сохраняемый между запусками.
+
+    links: URL -> title, rubric, first_seen, last_modified;
+    pages: страница рубрики -> ETag, Last-Modified, ссылки и следующая страница
+    (для условных запросов).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        data = read_json(self.path)
+        self.links = data.get("links", {})
+        self.pages = data.get("pages", {})
+
+    def save(self):
+        """Сохраняет индекс, объединяя его с изменениями других процессов."""
+
+        def merge(data):
+            self.links = {**data.get("links", {}), **self.links}
+            self.pages = {**data.get("pages", {}), **self.pages}
+            return {"links": self.links, "pages": self.pages}
+
+        update_json(self.path, merge)
+
+    def add(self, url, title, rubric, last_modified):
+        """Добавляет ссылку; возвращает True, если она новая."""
+        entry = self.links.get(url)
+        if entry is None:
+            self.links[url] = {
+                "title": title,
+                "rubric": rubric,
+                "first_seen": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "last_modified": last_modified,
+            }
+            return True
+        if entry["title"] != title:
+            entry.update(title=title, last_modified=last_modified)
+        return False
+
+
+def page_number(url):
+    page = parse_qs(urlparse(url).query).get("page", ["1"])[0]
+    return int(page) if page.isdigit() else 1
+
+
+def parse_listing(html, page_url, phrases):
+    """Ссылки на отчёты [(url, title)] и адрес следующей страницы."""
+    doc = lxml.html.fromstring(html)
+    links = []
+    next_url = None
+    path = urlparse(page_url).path
+    current = page_number(page_url)
+    for tag in doc.iter("a"):
+        href = tag.get("href")
+        if not href:
+            continue
+        url = urljoin(page_url, href)
+        title = " ".join(tag.text_content().split())
+        if href.startswith("/") and any(phrase in title for phrase in phrases):
+            links.append((url, title))
+        elif "next" in f"{tag.get('rel', '')} {tag.get('class', '')}":
+            next_url = next_url or url
+        elif urlparse(url).path == path and page_number(url) == current + 1:
+            next_url = next_url or url
+    return links, next_url
+
+
+def fetch_listing(session, index, page_url, phrases):
+    """Условный запрос страницы рубрики; при 304 ответ берётся из индекса."""
+    cached = index.pages.get(page_url, {})
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    with governor.slot(f"http:{urlparse(page_url).netloc}"):
+        resp = session.get(page_url, headers=headers, timeout=10)
+    if resp.status_code == 304:
+        return [tuple(link) for link in cached["links"]], cached.get("next"), cached
+    resp.raise_for_status()
+
+    links, next_url = parse_listing(resp.text, page_url, phrases)
+    page = {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "links": links,
+        "next": next_url,
+    }
+    index.pages[page_url] = page
+    return links, next_url, page
+
+
+def crawl(rubric_urls, phrases, full=False):
+    """Ссылки на отчёты [(url, title, rubric)] по всем рубрикам.
+
+    Страницы рубрики обходятся, пока на них появляются новые ссылки
+    (full=True — все страницы). Ссылки, ушедшие с просмотренных страниц,
+    берутся из индекса, поэтому старые отчёты не теряются.
+    """
+    index = LinkIndex(Path(loader_settings.cache_dir) / "links.json")
+    session = requests.Session()
+    result = {}
+    for rubric in rubric_urls:
+        page_url, visited = rubric, set()
+        while page_url and page_url not in visited:
+            if len(visited) >= loader_settings.max_listing_pages:
+                break
+            visited.add(page_url)
+            try:
+                links, next_url, page = fetch_listing(session, index, page_url, phrases)
+            except Exception as e:
+                logger.error(f"Ошибка при загрузке {page_url}: {e}")
+                break
+            new_links = 0
+            for url, title in links:
+                new_links += index.add(url, title, rubric, page.get("last_modified"))
+                result.setdefault(url, (title, rubric))
+            page_url = next_url if full or new_links else None
+        logger.info(f"Рубрика {rubric}: просмотрено страниц {len(visited)}")
+
+        for url, entry in index.links.items():
+            if entry["rubric"] == rubric:
+                result.setdefault(url, (entry["title"], rubric))
+
+    index.save()
+    return [(url, title, rubric) for url, (title, rubric) in result.items()]
@@ -0,0 +1,463 @@
+import logging
+import re
+from calendar import monthrange
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlparse
+
+import lxml.html
+import numpy as np
+import pandas as pd
+import requests
+
+from aggregation import add_period_totals
+from config import loader_settings, settings
+from crawler import crawl
+from governor import governor
+from profiling import profiler
+from projections import ensure_projections
+from spool import (
+    cached_report,
+    conditional_headers,
+    remember,
+    reuse_cached,
+    spool_response,
+)
+from specs import BASE_URL, RUBRIC_URLS, SPECS
+
+logger = logging.getLogger(__name__)
+
+MONTHS = {
+    "январь": 1,
+    "февраль": 2,
+    "март": 3,
+    "апрель": 4,
+    "май": 5,
+    "июнь": 6,
+    "июль": 7,
+    "август": 8,
+    "сентябрь": 9,
+    "октябрь": 10,
+    "ноябрь": 11,
+    "декабрь": 12,
+}
+
+
+# --- Разбор подписей ---
+def normalize(value):
+    return re.sub(r"\s+", " ", str(value)).strip().lower()
+
+
+def strip_item_number(label):
+    return re.sub(r"^\d+\.\s*", "", label)
+
+
+def parse_period(value, period_format):
+    """Подпись колонки -> последний день месяца ("YYYY-MM-DD") или None."""
+    if not isinstance(value, str):
+        return None
+    if period_format == "mm.yy":
+        match = re.fullmatch(r"(\d{1,2})\.(\d{2})", re.sub(r"[^\d\.]", "", value))
+        if not match:
+            return None
+        month, year = int(match[1]), 2000 + int(match[2])
+    elif period_format == "month yyyy":
+        match = re.search(r"за\s(\w+)\s(\d{4})", value.strip())
+        if not match:
+            return None
+        month, year = MONTHS.get(match[1].lower()), int(match[2])
+        if not month:
+            return None
+    else:
+        raise ValueError(f"Неизвестный формат периода: {period_format}")
+    if not 1 <= month <= 12:
+        return None
+    return f"{year}-{month:02d}-{monthrange(year, month)[1]}"
+
+
+def to_number(raw, fill_missing=None):
+    """Векторное приведение ячеек к float: пробелы и запятые допускаются."""
+    text = (
+        raw.astype(str)
+        .str.replace(r"\s", "", regex=True)
+        .str.replace(",", ".", regex=False)
+    )
+    values = pd.to_numeric(text, errors="coerce")
+    if fill_missing is not None:
+        values = values.mask(raw.isna(), fill_missing)
+    return values
+
+
+# --- Сбор ссылок ---
+def discover_links(spec, entries):
+    """Ссылки на отчёты витрины из общего списка [(url, title, rubric)].
+
+    Порядок ссылок — по spec.rubrics: при совпадении периодов в нескольких
+    отчётах остаются значения из первого.
+    """
+    order = {rubric: i for i, rubric in enumerate(spec.rubrics)}
+    links = {
+        url: title
+        for url, title, rubric in sorted(entries, key=lambda e: order.get(e[2], 0))
+        if rubric in order
+        and spec.link_include in title
+        and not any(bad in title for bad in spec.link_exclude)
+    }
+    logger.info(f"[{spec.name}] Найдено ссылок: {len(links)}")
+    return links
+
+
+# --- Загрузка файлов ---
+def download(url):
+    """Скачивает отчёт (или xlsx со страницы отчёта) в spool-каталог.
+
+    Ответ пишется на диск по частям; в пределах дня файл берётся из кэша,
+    позже — условным запросом (при 304 используется уже скачанный файл).
+    """
+    path = cached_report(url)
+    if path:
+        return path
+
+    http = f"http:{urlparse(url).netloc}"
+    with governor.slot(http), requests.get(
+        url, headers=conditional_headers(url), timeout=30, stream=True
+    ) as resp:
+        if resp.status_code == 304:
+            return reuse_cached(url)
+        resp.raise_for_status()
+        if "text/html" not in resp.headers.get("content-type", "").lower():
+            return spool_response(resp, url)
+        hrefs = lxml.html.fromstring(resp.text).xpath("//a/@href")
+
+    href = next((h for h in hrefs if ".xlsx" in h.lower()), None)
+    if not href:
+        logger.info(f"XLSX-файл не найден на HTML-странице: {url}")
+        return None
+    file_url = BASE_URL + href
+    with governor.slot(http), requests.get(
+        file_url, headers=conditional_headers(file_url), timeout=30, stream=True
+    ) as resp:
+        if resp.status_code == 304:
+            path = reuse_cached(file_url)
+        else:
+            resp.raise_for_status()
+            path = spool_response(resp, file_url)
+    if path:
+        remember(url, path)
+    return path
+
+
+# --- Разбор листа по описанию ---
+def find_sheet(xls, name):
+    """Лист с именем name, иначе первый лист, имя которого его содержит."""
+    sheets = [s for s in xls.sheet_names if name in s.lower()]
+    exact = [s for s in sheets if s.strip().lower() == name]
+    return (exact or sheets or [None])[0]
+
+
+def layout_period(label, layout):
+    """PERIOD по подписи колонки с учётом layout.skip_prefixes."""
+    if any(normalize(label).startswith(p) for p in layout.skip_prefixes):
+        return None
+    return parse_period(label, layout.period_format)
+
+
+def layout_columns(df, layout):
+    """Колонки с данными: [(позиция, PERIOD, нормализованный ключ)]."""
+    columns = []
+    if layout.offsets:
+        for j, label in enumerate(df.iloc[layout.period_row]):
+            period = layout_period(label, layout)
+            if j == 0 or period is None:
+                continue
+            for key, offset in layout.offsets:
+                if j + offset < df.shape[1]:
+                    columns.append((j + offset, period, key))
+        return columns
+
+    periods = df.iloc[layout.period_row].ffill()
+    key_rows = [df.iloc[row].ffill() for row in layout.key_rows]
+    for j in range(1, df.shape[1]):
+        parts = [row.iloc[j] for row in key_rows]
+        if pd.isna(periods.iloc[j]) or any(pd.isna(p) for p in parts):
+            continue
+        period = layout_period(str(periods.iloc[j]).strip(), layout)
+        if period is not None:
+            columns.append((j, period, normalize(" ".join(map(str, parts)))))
+    return columns
+
+
+def label_matches(label, key):
+    text = normalize(label.text)
+    return key == text if label.exact else text in key
+
+
+def matching_rows(labels, label):
+    """Позиции строк листа, подходящих под label (см. specs.Label)."""
+    text = normalize(label.text)
+    if label.exact:
+        return np.flatnonzero(labels.map(strip_item_number).to_numpy() == text)
+    hits = np.flatnonzero(labels.str.contains(text, regex=False).to_numpy())
+    return hits[:1]
+
+
+def parse_rates(xls, spec):
+    """Ставки за период: PERIOD, RATE_NAT, RATE_FOR."""
+    rates = spec.rates
+    df = xls.parse(find_sheet(xls, rates.sheet), header=None)
+    rows = []
+    for j, label in enumerate(df.iloc[rates.period_row]):
+        period = parse_period(label, spec.layout.period_format)
+        if period is None or j + 1 >= df.shape[1]:
+            continue
+        first = df.iloc[rates.value_row, j]
+        second = df.iloc[rates.value_row, j + 1]
+        if rates.national_marker in str(df.iloc[rates.currency_row, j]).lower():
+            rows.append((period, first, second))
+        else:
+            rows.append((period, second, first))
+    frame = pd.DataFrame(rows, columns=["PERIOD", "RATE_NAT", "RATE_FOR"])
+    return frame.drop_duplicates(subset=["PERIOD"])
+
+
+def parse_workbook(xls, spec):
+    """Ячейки отчёта по spec: PERIOD, TYPE, TYPE_DESCRIPTION, VALUE (сырое)."""
+    layout = spec.layout
+    sheet = find_sheet(xls, layout.sheet)
+    if not sheet or (spec.rates and not find_sheet(xls, spec.rates.sheet)):
+        logger.error(f"[{spec.name}] Нужные листы не найдены.")
+        return None
+
+    df = xls.parse(sheet, header=None)
+    columns = layout_columns(df, layout)
+    logger.info(f"[{spec.name}] Найдено {len(columns)} колонок с данными.")
+
+    raw_labels = df.iloc[layout.data_start :, 0]
+    raw_labels = raw_labels[raw_labels.notna()]
+    labels = raw_labels.map(normalize)
+    offset_rows = raw_labels.index.to_numpy()
+
+    values = df.to_numpy()
+    frames = []
+    for rule in spec.rules:
+        rows = matching_rows(labels, rule.row)
+        cols = [
+            (j, period) for j, period, key in columns if label_matches(rule.column, key)
+        ]
+        if not len(rows) or not cols:
+            continue
+        positions, periods = zip(*cols)
+        block = values[np.ix_(offset_rows[rows], positions)]
+        if rule.description:
+            descriptions = [rule.description] * len(rows)
+        else:
+            descriptions = [
+                strip_item_number(re.sub(r"\s+", " ", str(v)).strip())
+                for v in raw_labels.iloc[rows]
+            ]
+        # По колонкам, внутри колонки — сверху вниз (как melt)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "PERIOD": np.repeat(periods, len(rows)),
+                    "TYPE": rule.type_id,
+                    "TYPE_DESCRIPTION": np.tile(descriptions, len(periods)),
+                    "VALUE": block.ravel(order="F"),
+                }
+            )
+        )
+    if not frames:
+        return None
+
+    cells = pd.concat(frames, ignore_index=True)
+    if spec.rates:
+        cells = cells.merge(parse_rates(xls, spec), on="PERIOD", how="left")
+    return cells
+
+
+def process_report(url, specs):
+    path = download(url)
+    if path is None:
+        return {}
+    with governor.slot("parse"), pd.ExcelFile(path, engine="openpyxl") as xls:
+        return {spec.name: parse_workbook(xls, spec) for spec in specs}
+
+
+# --- Сборка итогового набора ---
+def finalize(spec, cells, timestamp):
+    df = cells.assign(VALUE=to_number(cells["VALUE"], spec.fill_missing))
+    df = df[df["VALUE"].notna()]
+    df = df.drop_duplicates(subset=["PERIOD", "TYPE"])
+    df["TYPE_DESCRIPTION"] = df.groupby("TYPE")["TYPE_DESCRIPTION"].transform("first")
+    if spec.decimals is not None:
+        df["VALUE"] = df["VALUE"].round(spec.decimals)
+
+    totals = []
+    for total in spec.totals:
+        sums = (
+            df[df["TYPE"].isin(total.components)]
+            .groupby("PERIOD", sort=False)["VALUE"]
+            .sum()
+        )
+        totals.append(
+            pd.DataFrame(
+                {
+                    "PERIOD": sums.index,
+                    "TYPE": total.type_id,
+                    "TYPE_DESCRIPTION": total.description,
+                    "VALUE": sums.to_numpy(),
+                }
+            )
+        )
+    df = pd.concat([*totals, df], ignore_index=True)
+    if spec.decimals is not None:
+        df["VALUE"] = df["VALUE"].round(spec.decimals)
+
+    if spec.rates:
+        rates = spec.rates
+        df[rates.column] = np.select(
+            [
+                df["TYPE"].isin(rates.national_types),
+                df["TYPE"].isin(rates.foreign_types),
+            ],
+            [
+                to_number(df["RATE_NAT"].astype(object)),
+                to_number(df["RATE_FOR"].astype(object)),
+            ],
+            default=np.nan,
+        )
+
+    df = df.rename(columns={"VALUE": spec.value_col}).assign(
+        LOAD_DATE=timestamp, PACKAGE_ID=0
+    )
+    if spec.yearly:
+        df["PERIOD_TYPE"] = "month"
+        # Годовые суммы только при наличии всех 12 месяцев
+        df = add_period_totals(
+            df[[c for c in spec.columns if c in df.columns]],
+            spec.value_col,
+            decimals=spec.decimals,
+        )
+    return df[list(spec.columns)]
+
+
+# --- Загрузка в витрину ---
+@contextmanager
+def vertica_session():
+    """Сессия Vertica в пределах лимита governor и в заданном resource pool."""
+    import vertica_python
+
+    with governor.slot("vertica"), vertica_python.connect(**settings.conn_info) as conn:
+        if settings.resource_pool:
+            conn.cursor().execute(
+                f"SET SESSION RESOURCE_POOL = {settings.resource_pool}"
+            )
+        yield conn
+
+
+def next_package_id(spec):
+    with vertica_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COALESCE(MAX(PACKAGE_ID), 0) FROM {spec.table}")
+        return cursor.fetchone()[0] + 1
+
+
+def load(spec, df, package_id=None):
+    """Пакетная вставка df в витрину spec.table.
+
+    package_id используется, если он ещё свободен (больше MAX(PACKAGE_ID));
+    иначе, например при повторе после частичной загрузки, берётся новый.
+    Возвращает (PACKAGE_ID, число невставленных строк).
+    """
+    columns = list(spec.columns)
+    insert_query = f"""
+    INSERT INTO {spec.table} (
+        {", ".join(columns)}
+    ) VALUES ({", ".join(f":{c}" for c in columns)})
+    """
+
+    with vertica_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COALESCE(MAX(PACKAGE_ID), 0) FROM {spec.table}")
+        free_package_id = cursor.fetchone()[0] + 1
+        if package_id is not None and package_id < free_package_id:
+            logger.warning(
+                f"[{spec.name}] PACKAGE_ID {package_id} уже занят, "
+                f"используется {free_package_id}"
+            )
+        package_id = max(package_id or 0, free_package_id)
+        logger.info(f"[{spec.name}] Новый PACKAGE_ID: {package_id}")
+        ensure_projections(cursor, spec)
+
+        df = df.assign(PACKAGE_ID=package_id).astype(object)
+        records = df.where(df.notna(), None).to_dict(orient="records")
+        failed_rows = 0
+        try:
+            cursor.executemany(insert_query, records)
+            conn.commit()
+            logger.info(f"[{spec.name}] Загружено в витрину: {len(records)} строк.")
+        except Exception as e:
+            logger.exception("Ошибка при пакетной вставке в Vertica: %s", str(e))
+            logger.info(
+                "Переход на построчную вставку для логирования проблемных записей..."
+            )
+            for idx, record in enumerate(records, start=1):
+                try:
+                    cursor.execute(insert_query, record)
+                except Exception as row_err:
+                    logger.error("Ошибка при вставке строки №%d: %s", idx, record)
+                    logger.error("Текст ошибки: %s", str(row_err))
+                    failed_rows += 1
+            conn.commit()
+            logger.warning(
+                "Построчная вставка завершена. Ошибочных строк: %d", failed_rows
+            )
+    return package_id, failed_rows
+
+
+def extract(specs, workers=None, full_crawl=False):
+    """Сбор ссылок, скачивание и разбор отчётов для всех specs.
+
+    Каждый отчёт скачивается и открывается один раз, даже если нужен
+    нескольким витринам; отчёты обрабатываются параллельно.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with profiler.stage("extract"):
+        # Индекс ссылок общий для всех витрин, поэтому фразы — по всем SPECS
+        phrases = {spec.link_include for spec in SPECS.values()}
+        entries = crawl(RUBRIC_URLS, phrases, full_crawl)
+        links = {spec.name: discover_links(spec, entries) for spec in specs}
+
+    report_specs = {}
+    for spec in specs:
+        for url in links[spec.name]:
+            report_specs.setdefault(url, []).append(spec)
+
+    def task(url):
+        try:
+            with profiler.stage("extract"):
+                return process_report(url, report_specs[url])
+        except Exception as e:
+            logger.error(f"Ошибка при обработке {url}: {e}")
+            return {}
+
+    with profiler.pool_stage("extract"):
+        with ThreadPoolExecutor(workers or loader_settings.workers) as pool:
+            parsed = dict(zip(report_specs, pool.map(task, report_specs)))
+
+    results = {}
+    with profiler.stage("extract"):
+        for spec in specs:
+            frames = [
+                parsed[url].get(spec.name)
+                for url in links[spec.name]
+                if parsed[url].get(spec.name) is not None
+            ]
+            if not frames:
+                logger.error(f"[{spec.name}] Данные не найдены.")
+                continue
+            results[spec.name] = finalize(
+                spec, pd.concat(frames, ignore_index=True), timestamp
+            )
+    return results
@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from governor import governor
+
+logger = logging.getLogger(__name__)
+
+REPLACE_RETRIES = 20
+METADATA_KEY = b"lending"
+
+
+@contextmanager
+def locked(path):
+    """Межпроцессная блокировка файла: чтение и запись идут под одним слотом."""
+    with governor.slot(f"file:{Path(path)}"):
+        yield
+
+
+def _tmp(path):
+    return path.with_name(f"{path.name}.{os.getpid()}_{threading.get_ident()}.tmp")
+
+
+def _replace(tmp, path):
+    # На Windows os.replace не проходит, пока файл открыт читателем без
+    # блокировки (например, в Excel), поэтому несколько повторов
+    for attempt in range(REPLACE_RETRIES):
+        try:
+            os.replace(tmp, path)
+            return
+        except PermissionError:
+            if attempt == REPLACE_RETRIES - 1:
+                tmp.unlink(missing_ok=True)
+                raise
+            time.sleep(0.1 * (attempt + 1))
+
+
+def _read_json(path):
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError as e:
+        logger.warning(f"Файл {path} повреждён, пропущен: {e}")
+        return {}
+
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _tmp(path)
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+    _replace(tmp, path)
+
+
+def read_json(path):
+    """Содержимое JSON-файла; {} если его нет или он повреждён."""
+    path = Path(path)
+    with locked(path):
+        return _read_json(path)
+
+
+def write_json(path, data):
+    """Атомарно записывает JSON-файл."""
+    path = Path(path)
+    with locked(path):
+        _write_json(path, data)
+
+
+def update_json(path, update):
+    """Чтение, изменение update(data) -> data и запись JSON под одной блокировкой."""
+    path = Path(path)
+    with locked(path):
+        data = update(_read_json(path))
+        _write_json(path, data)
+    return data
+
+
+def read_parquet(path, **kwargs):
+    """Parquet-файл или None, если его нет."""
+    path = Path(path)
+    with locked(path):
+        if not path.exists():
+            return None
+        return pd.read_parquet(path, engine="pyarrow", **kwargs)
+
+
+def read_parquet_metadata(path):
+    """Метаданные, записанные write_parquet(metadata=...), или None."""
+    path = Path(path)
+    with locked(path):
+        if not path.exists():
+            return None
+        metadata = pq.read_schema(path).metadata or {}
+    raw = metadata.get(METADATA_KEY)
+    return json.loads(raw) if raw else None
+
+
+def write_parquet(path, df, metadata=None, **kwargs):
+    """Атомарно записывает df в Parquet.
+
+    metadata (dict) сохраняется в схеме того же файла, поэтому данные
+    и их описание всегда заменяются вместе.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if metadata is not None:
+        table = table.replace_schema_metadata(
+            {
+                **(table.schema.metadata or {}),
+                METADATA_KEY: json.dumps(metadata, ensure_ascii=False).encode(),
+            }
+        )
+    with locked(path):
+        tmp = _tmp(path)
+        pq.write_table(table, tmp, **kwargs)
+        _replace(tmp, path)
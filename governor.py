@@ -0,0 +1,184 @@
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from config import loader_settings
+
+if os.name == "nt":
+    import ctypes
+    import msvcrt
+
+    def _pid_alive(pid):
+        # PROCESS_QUERY_LIMITED_INFORMATION; os.kill на Windows завершает процесс
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+
+    def _try_lock(f):
+        f.seek(0)
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _pid_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _try_lock(f):
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(f):
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_worker_limit():
+    """Число одновременных разборов: по CPU и бюджету памяти."""
+    if loader_settings.parse_workers:
+        return loader_settings.parse_workers
+    by_ram = (
+        loader_settings.parse_ram_budget_mb // loader_settings.parse_ram_per_worker_mb
+    )
+    return max(1, min(os.cpu_count() or 1, by_ram))
+
+
+class Governor:
+    """Ограничитель ресурсов, общий для всех процессов загрузчиков.
+
+    Слот ресурса — заблокированный файл в lock_dir, поэтому лимиты
+    соблюдаются и между параллельно запущенными витринами. Ожидающие
+    оставляют файл-маркер, по которым считается длина очереди; маркеры
+    завершившихся процессов удаляются. timeout — предел ожидания слота
+    в секундах (0 — без ограничения).
+    """
+
+    def __init__(self, lock_dir, limits, poll=0.1, timeout=0):
+        self.lock_dir = Path(lock_dir)
+        self.limits = limits
+        self.poll = poll
+        self.timeout = timeout
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def limit(self, resource):
+        return self.limits.get(resource.split(":")[0], 1)
+
+    def queue_depth(self, resource):
+        depth = 0
+        for marker in self.lock_dir.glob(f"{self._name(resource)}.*.wait"):
+            pid = marker.name.rsplit(".", 2)[-2].split("_")[0]
+            if pid.isdigit() and not _pid_alive(int(pid)):
+                marker.unlink(missing_ok=True)
+                continue
+            depth += 1
+        return depth
+
+    @staticmethod
+    def _name(resource):
+        return re.sub(r"[^\w.-]", "_", resource)
+
+    def _acquire(self, resource):
+        name = self._name(resource)
+        for slot in range(self.limit(resource)):
+            f = open(self.lock_dir / f"{name}.{slot}.lock", "a+b")
+            if _try_lock(f):
+                return f
+            f.close()
+        return None
+
+    @contextmanager
+    def slot(self, resource, timeout=None):
+        """Занимает слот resource ("http:host", "parse", "vertica") на время блока.
+
+        Если слот не освободился за timeout секунд (по умолчанию — общий
+        timeout ограничителя), поднимается TimeoutError.
+        """
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        f = self._acquire(resource)
+        if f is None:
+            marker = self.lock_dir / (
+                f"{self._name(resource)}.{os.getpid()}_{threading.get_ident()}.wait"
+            )
+            marker.touch()
+            try:
+                while f is None:
+                    if timeout and time.perf_counter() - started > timeout:
+                        raise TimeoutError(
+                            f"Ресурс {resource} не освободился за {timeout} с "
+                            f"(лимит {self.limit(resource)}, "
+                            f"очередь {self.queue_depth(resource)}, "
+                            f"блокировки в {self.lock_dir})"
+                        )
+                    time.sleep(self.poll)
+                    f = self._acquire(resource)
+            finally:
+                marker.unlink(missing_ok=True)
+        waited = time.perf_counter() - started
+        self._record(resource, waited)
+        try:
+            yield
+        finally:
+            _unlock(f)
+            f.close()
+
+    def _record(self, resource, waited):
+        with self._stats_lock:
+            stats = self._stats.setdefault(
+                resource, {"acquired": 0, "wait_s": 0.0, "max_wait_s": 0.0}
+            )
+            stats["acquired"] += 1
+            stats["wait_s"] += waited
+            stats["max_wait_s"] = max(stats["max_wait_s"], waited)
+        if waited > 1:
+            logger.info(f"Ожидание ресурса {resource}: {waited:.1f} с")
+
+    def stats(self):
+        """Статистика процесса: занятия, ожидание, текущая очередь по ресурсам."""
+        with self._stats_lock:
+            return {
+                resource: {
+                    **stats,
+                    "limit": self.limit(resource),
+                    "queue": self.queue_depth(resource),
+                }
+                for resource, stats in self._stats.items()
+            }
+
+
+governor = Governor(
+    loader_settings.lock_dir,
+    {
+        "http": loader_settings.http_per_host,
+        "parse": parse_worker_limit(),
+        "vertica": loader_settings.vertica_sessions,
+    },
+    timeout=loader_settings.slot_timeout,
+)
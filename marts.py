@@ -0,0 +1,139 @@
+import logging
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from config import loader_settings
+from filestore import locked, read_parquet, read_parquet_metadata, write_parquet
+
+logger = logging.getLogger(__name__)
+
+
+def _path(name):
+    return Path(loader_settings.cache_dir) / "marts" / f"{name}.parquet"
+
+
+def conform(spec, df):
+    """Приводит строки витрины к схеме локальной копии.
+
+    Строки из Vertica (Timestamp, Decimal, date) и из отчётов (строки,
+    float) после этого одинаковы: LOAD_DATE и PERIOD — строки, значения —
+    float, TYPE и PACKAGE_ID — int64.
+    """
+    numeric = [spec.value_col] + ([spec.rates.column] if spec.rates else [])
+    df = df.assign(
+        LOAD_DATE=pd.to_datetime(df["LOAD_DATE"]).dt.strftime("%Y-%m-%d %H:%M:%S"),
+        PERIOD=pd.to_datetime(df["PERIOD"]).dt.strftime("%Y-%m-%d"),
+        TYPE=df["TYPE"].astype("int64"),
+        PACKAGE_ID=df["PACKAGE_ID"].astype("int64"),
+        **{c: pd.to_numeric(df[c], errors="coerce").astype(float) for c in numeric},
+    )
+    return df[list(spec.columns)]
+
+
+def publish(spec, df, package_id):
+    """Обновляет локальную копию витрины её текущим состоянием.
+
+    df — последние загруженные значения ячеек с PACKAGE_ID по строкам,
+    package_id — последний загруженный пакет. Метаданные хранятся в том же
+    Parquet-файле, он заменяется атомарно, поэтому читатели всегда видят
+    целое состояние вместе с его PACKAGE_ID.
+    """
+    df = conform(spec, df)
+    metadata = {
+        "table": spec.table,
+        "package_id": int(package_id),
+        "rows": len(df),
+        "published": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    write_parquet(_path(spec.name), df, metadata, compression="zstd")
+    logger.info(f"[{spec.name}] Локальная копия обновлена: PACKAGE_ID {package_id}")
+
+
+def updated_state(spec, df, delta):
+    """Состояние витрины после загрузки delta (строки с PACKAGE_ID).
+
+    Основа — локальная копия: ячейки df, которых в ней нет (например,
+    копии ещё нет), добавляются, ячейки delta заменяются. Ячейки, не
+    попавшие в этот запуск (карантин, не скачанные отчёты), остаются
+    такими же, как в Vertica.
+    """
+    from changes import cell_keys
+
+    layers = [df]
+    cached = read_parquet(_path(spec.name))
+    if cached is not None:
+        layers.append(cached)
+    layers.append(delta)
+    state = pd.concat(
+        [
+            conform(spec, layer).set_axis(
+                pd.MultiIndex.from_frame(cell_keys(spec, layer))
+            )
+            for layer in layers
+        ]
+    )
+    state = state[~state.index.duplicated(keep="last")].sort_index()
+    return state.reset_index(drop=True)
+
+
+def cache_info(name):
+    """Метаданные локальной копии (table, package_id, rows, published) или None."""
+    return read_parquet_metadata(_path(name))
+
+
+def read_mart(name, period_from=None, period_to=None, types=None, period_type="month"):
+    """Текущее состояние витрины из локальной копии.
+
+    period_from/period_to — "YYYY-MM-DD" включительно, types — список TYPE,
+    period_type — "month"/"year" (None — без фильтра; для витрин без
+    PERIOD_TYPE не используется). Фильтры применяются при чтении Parquet.
+    """
+    data_path = _path(name)
+    if not data_path.exists():
+        raise FileNotFoundError(
+            f"Нет локальной копии витрины {name}: выполните загрузку "
+            f"или 'cli.py cache-refresh {name}'"
+        )
+
+    filters = []
+    if period_from:
+        filters.append(("PERIOD", ">=", str(period_from)))
+    if period_to:
+        filters.append(("PERIOD", "<=", str(period_to)))
+    if types:
+        filters.append(("TYPE", "in", list(types)))
+    with locked(data_path):
+        if period_type and "PERIOD_TYPE" in pq.read_schema(data_path).names:
+            filters.append(("PERIOD_TYPE", "==", period_type))
+        return pd.read_parquet(data_path, engine="pyarrow", filters=filters or None)
+
+
+def refresh_from_vertica(spec):
+    """Заполняет локальную копию и отпечатки ячеек текущим состоянием Vertica.
+
+    Загрузки бывают дельтами, поэтому для каждой ячейки берётся строка
+    с наибольшим PACKAGE_ID.
+    """
+    from changes import key_columns, rebuild_fingerprints
+    from engine import vertica_session
+
+    columns = ", ".join(spec.columns)
+    with vertica_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {columns} FROM {spec.table} "
+            f"LIMIT 1 OVER (PARTITION BY {', '.join(key_columns(spec))} "
+            f"ORDER BY PACKAGE_ID DESC)"
+        )
+        df = pd.DataFrame(cursor.fetchall(), columns=list(spec.columns))
+    if df.empty:
+        logger.warning(f"[{spec.name}] Витрина пуста, локальная копия не обновлена.")
+        return None
+    df = conform(spec, df)
+    package_id = int(df["PACKAGE_ID"].max())
+    publish(spec, df, package_id)
+    rebuild_fingerprints(spec, df)
+    return package_id
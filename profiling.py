@@ -0,0 +1,157 @@
+import cProfile
+import json
+import logging
+import pstats
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from config import loader_settings
+
+logger = logging.getLogger(__name__)
+
+# С Python 3.12 cProfile профилирует все потоки процесса
+PROCESS_WIDE = sys.version_info >= (3, 12)
+
+
+class StageProfiler:
+    """Профилирование этапов запуска через cProfile (включается явно).
+
+    Этап может выполняться в нескольких потоках: до Python 3.12 у каждого
+    потока свой cProfile.Profile, статистика этапа объединяется при
+    сохранении. С 3.12 профилировщик общий для процесса: профиль этапа,
+    открытого первым, уже учитывает работу всех потоков, а попытки
+    открыть этот же этап в других потоках пропускаются (см. pool_stage).
+    Файлы пишутся в profile_dir рядом с логами.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.out_dir = None
+        self.run_name = None
+        self._profiles = {}
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def enable(self, run_name):
+        self.enabled = True
+        self.run_name = f"{run_name}_{datetime.now():%Y%m%d_%H%M%S}"
+        self.out_dir = Path(loader_settings.profile_dir)
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Python 3.12+: в процессе уже работает другой профилировщик
+            with self._lock:
+                active = set(self._active)
+            if name in active:
+                logger.debug(f"Этап {name}: поток учтён в уже открытом профиле")
+            else:
+                logger.warning(
+                    f"Этап {name} не профилируется (активны: {active or '-'}): {e}"
+                )
+            yield
+            return
+        with self._lock:
+            self._active.add(name)
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self._active.discard(name)
+                self._profiles.setdefault(name, []).append(profile)
+
+    @contextmanager
+    def pool_stage(self, name):
+        """Этап в потоке, который ждёт пул рабочих потоков.
+
+        До 3.12 этап открывают сами рабочие потоки, а ожидание pool.map
+        в профиль не попадает (иначе главной функцией этапа становится
+        lock.acquire). С 3.12 только профиль, открытый здесь, охватывает
+        все рабочие потоки.
+        """
+        if not PROCESS_WIDE:
+            yield
+            return
+        with self.stage(name):
+            yield
+
+    def save(self):
+        """Пишет .pstats и .speedscope.json по этапам; возвращает строки отчёта."""
+        if not self.enabled:
+            return []
+        top = loader_settings.profile_top
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        lines = []
+        with self._lock:
+            profiles = dict(self._profiles)
+        for name, stage_profiles in profiles.items():
+            stats = pstats.Stats(*stage_profiles)
+            base = self.out_dir / f"{self.run_name}_{name}"
+            stats.dump_stats(f"{base}.pstats")
+            write_speedscope(stats, f"{base}.speedscope.json", name)
+            for func, tottime, cumtime, calls in hotspots(stats, top):
+                lines.append(
+                    f"hotspot[{name}]: {func} self={tottime:.3f}s "
+                    f"cum={cumtime:.3f}s calls={calls}"
+                )
+        logger.info(f"Профили сохранены в {self.out_dir}")
+        return lines
+
+
+def _label(func):
+    filename, line, name = func
+    return f"{name} ({Path(filename).name}:{line})" if line else name
+
+
+def hotspots(stats, top):
+    """Функции с наибольшим собственным временем."""
+    rows = [
+        (_label(func), tottime, cumtime, calls)
+        for func, (_, calls, tottime, cumtime, _) in stats.stats.items()
+    ]
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+
+
+def write_speedscope(stats, path, name):
+    """speedscope-профиль собственного времени функций (вид Sandwich).
+
+    cProfile не хранит стеки, поэтому каждая функция — отдельный сэмпл
+    с весом, равным её собственному времени.
+    """
+    frames, samples, weights = [], [], []
+    for func, (_, _, tottime, _, _) in stats.stats.items():
+        if tottime <= 0:
+            continue
+        filename, line, _ = func
+        frames.append({"name": _label(func), "file": filename, "line": line})
+        samples.append([len(frames) - 1])
+        weights.append(tottime)
+    document = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+    Path(path).write_text(json.dumps(document), encoding="utf-8")
+
+
+profiler = StageProfiler()
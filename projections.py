@@ -0,0 +1,103 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _split_name(table):
+    schema, _, name = table.rpartition(".")
+    return schema or "public", name
+
+
+def _projection_exists(cursor, schema, name):
+    # В K-safe кластере проекции называются <name>_b0/_b1, поэтому сравнение
+    # по projection_basename; ILIKE не годится — "_" в нём шаблон.
+    cursor.execute(
+        "SELECT 1 FROM v_catalog.projections "
+        "WHERE UPPER(projection_schema) = UPPER(:schema) "
+        "AND UPPER(projection_basename) = UPPER(:name)",
+        {"schema": schema, "name": name},
+    )
+    return cursor.fetchone() is not None
+
+
+def projection_ddl(spec):
+    """DDL проекций и представлений витрины.
+
+    - {table}_BY_PERIOD — сортировка и сегментация по (PERIOD, TYPE);
+    - {table}_CURRENT_TOPK — Top-K проекция: последнее загруженное значение
+      каждой ячейки (пакеты содержат только изменившиеся строки);
+    - {table}_CURRENT — представление с тем же запросом, Vertica отвечает
+      на него из {table}_CURRENT_TOPK, не читая историю пакетов;
+    - {table}_YEARLY — годовые суммы по полным годам поверх {table}_CURRENT.
+    """
+    schema, name = _split_name(spec.table)
+    period_type = "PERIOD_TYPE" in spec.columns
+    cell_key = "PERIOD, PERIOD_TYPE, TYPE" if period_type else "PERIOD, TYPE"
+    # Колонки PARTITION BY и ORDER BY — первыми в списке Top-K проекции
+    leading = [*cell_key.split(", "), "PACKAGE_ID"]
+    columns = ", ".join(leading + [c for c in spec.columns if c not in leading])
+    current = f"""
+            SELECT {columns} FROM {spec.table}
+            LIMIT 1 OVER (PARTITION BY {cell_key} ORDER BY PACKAGE_ID DESC)
+    """
+    month_filter = "WHERE PERIOD_TYPE = 'month'" if period_type else ""
+
+    projections = {
+        f"{name}_BY_PERIOD": f"""
+            CREATE PROJECTION {schema}.{name}_BY_PERIOD AS
+            SELECT * FROM {spec.table}
+            ORDER BY PERIOD, TYPE
+            SEGMENTED BY HASH(PERIOD, TYPE) ALL NODES
+        """,
+        f"{name}_CURRENT_TOPK": f"""
+            CREATE PROJECTION {schema}.{name}_CURRENT_TOPK AS {current}
+        """,
+    }
+    views = {
+        f"{name}_CURRENT": f"""
+            CREATE OR REPLACE VIEW {schema}.{name}_CURRENT AS {current}
+        """,
+        f"{name}_YEARLY": f"""
+            CREATE OR REPLACE VIEW {schema}.{name}_YEARLY AS
+            SELECT
+                TYPE,
+                YEAR(PERIOD) AS YEAR,
+                SUM({spec.value_col}) AS {spec.value_col}
+            FROM {schema}.{name}_CURRENT
+            {month_filter}
+            GROUP BY TYPE, YEAR(PERIOD)
+            HAVING COUNT(DISTINCT MONTH(PERIOD)) = 12
+        """,
+    }
+    return projections, views
+
+
+def ensure_projections(cursor, spec):
+    """Создаёт недостающие проекции витрины и обновляет представления.
+
+    Новые проекции заполняются через REFRESH один раз, дальше Vertica
+    поддерживает их сама при каждой вставке. Ошибки (например, нет прав на
+    DDL) не мешают загрузке и только пишутся в лог; каждый объект создаётся
+    отдельно, чтобы ошибка одного не пропускала остальные.
+    """
+    schema, _ = _split_name(spec.table)
+    projections, views = projection_ddl(spec)
+    created = []
+    for name, ddl in projections.items():
+        try:
+            if not _projection_exists(cursor, schema, name):
+                cursor.execute(ddl)
+                created.append(name)
+        except Exception as e:
+            logger.warning(f"Не удалось создать проекцию {name}: {e}")
+    if created:
+        logger.info(f"Созданы проекции: {', '.join(created)}")
+        try:
+            cursor.execute(f"SELECT REFRESH('{spec.table}')")
+        except Exception as e:
+            logger.warning(f"Не удалось заполнить проекции {spec.table}: {e}")
+    for name, ddl in views.items():
+        try:
+            cursor.execute(ddl)
+        except Exception as e:
+            logger.warning(f"Не удалось обновить представление {name}: {e}")
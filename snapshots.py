@@ -0,0 +1,42 @@
+import logging
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from config import loader_settings
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_path(name, package_id):
+    return Path(loader_settings.snapshot_dir) / f"{name}_{package_id}.parquet"
+
+
+def save_snapshot(spec, df, package_id):
+    """Сохраняет итоговый набор витрины перед загрузкой в Vertica."""
+    path = snapshot_path(spec.name, package_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.assign(PACKAGE_ID=package_id).to_parquet(
+        path, engine="pyarrow", compression="zstd", index=False
+    )
+    logger.info(f"[{spec.name}] Снимок сохранён: {path}")
+    return path
+
+
+def latest_snapshot(name):
+    """Снимок витрины с наибольшим PACKAGE_ID или None."""
+    pattern = re.compile(rf"{re.escape(name)}_(\d+)\.parquet")
+    snapshots = {
+        int(match[1]): path
+        for path in Path(loader_settings.snapshot_dir).glob(f"{name}_*.parquet")
+        if (match := pattern.fullmatch(path.name))
+    }
+    return snapshots[max(snapshots)] if snapshots else None
+
+
+def read_snapshot(path):
+    """Набор строк снимка и PACKAGE_ID, под которым он был подготовлен."""
+    df = pd.read_parquet(path, engine="pyarrow")
+    package_id = int(df["PACKAGE_ID"].iloc[0]) if len(df) else None
+    return df, package_id
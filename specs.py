@@ -0,0 +1,277 @@
+from dataclasses import dataclass
+
+BASE_URL = "https://www.nationalbank.kz"
+RUBRIC_URL = f"{BASE_URL}/ru/news/banking-sector-loans-to-economy-analytics/rubrics"
+RUBRIC_URLS = [f"{RUBRIC_URL}/{rubric_id}" for rubric_id in (2319, 2204, 1985, 1907)]
+
+
+def rubrics(*rubric_ids):
+    return tuple(f"{RUBRIC_URL}/{rubric_id}" for rubric_id in rubric_ids)
+
+
+@dataclass(frozen=True)
+class Label:
+    """Условие на подпись строки (колонка 0) или ключ колонки.
+
+    exact=False — первая строка, подпись которой содержит text;
+    exact=True — все строки, подпись которых (без номера пункта) равна text.
+    Сравнение без учёта регистра и повторных пробелов.
+    """
+
+    text: str
+    exact: bool = False
+
+
+@dataclass(frozen=True)
+class SheetLayout:
+    """Расположение данных на листе (индексы строк при header=None).
+
+    Период берётся из period_row; колонки, подпись периода которых
+    начинается с одного из skip_prefixes (например, нарастающие итоги
+    "за 03.25"), пропускаются. Ключ колонки собирается либо из строк
+    key_rows (с протягиванием объединённых ячеек), либо задаётся смещениями
+    offsets от колонки с подписью периода.
+    """
+
+    sheet: str
+    period_row: int
+    period_format: str
+    data_start: int
+    key_rows: tuple[int, ...] = ()
+    offsets: tuple[tuple[str, int], ...] = ()
+    skip_prefixes: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class CellRule:
+    """Ячейка (строка x колонка) -> TYPE.
+
+    Без description описание берётся из подписи строки.
+    """
+
+    type_id: int
+    row: Label
+    column: Label
+    description: str | None = None
+
+
+@dataclass(frozen=True)
+class Total:
+    """Производный TYPE как сумма компонент за период."""
+
+    type_id: int
+    description: str
+    components: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class RateLayout:
+    """Ставки вознаграждения с отдельного листа.
+
+    Под подписью периода две колонки: в национальной и иностранной валюте,
+    порядок определяется подписью в currency_row.
+    """
+
+    sheet: str
+    period_row: int
+    currency_row: int
+    value_row: int
+    national_marker: str
+    national_types: tuple[int, ...]
+    foreign_types: tuple[int, ...]
+    column: str = "RATE_PERCENTAGE"
+    valid_range: tuple[float, float] = (0.0, 100.0)
+
+
+@dataclass(frozen=True)
+class ReportSpec:
+    """Описание витрины: какие отчёты брать, как их разбирать и куда грузить.
+
+    rubrics — рубрики витрины в порядке приоритета: при совпадении периодов
+    в нескольких отчётах берутся значения из отчёта более ранней рубрики.
+    """
+
+    name: str
+    table: str
+    value_col: str
+    columns: tuple[str, ...]
+    link_include: str
+    layout: SheetLayout
+    rules: tuple[CellRule, ...]
+    rubrics: tuple[str, ...] = tuple(RUBRIC_URLS)
+    link_exclude: tuple[str, ...] = ()
+    totals: tuple[Total, ...] = ()
+    rates: RateLayout | None = None
+    fill_missing: float | None = None
+    decimals: int | None = None
+    yearly: bool = False
+
+
+TOTAL = ReportSpec(
+    name="total",
+    table="DWH.D_LENDING_TOTAL_BVU_RK",
+    # table="SANDBOX.D_LENDING_TOTAL_BVU_RK",
+    value_col="ISSUED_MONTH_KZT",
+    columns=(
+        "LOAD_DATE",
+        "PACKAGE_ID",
+        "TYPE",
+        "TYPE_DESCRIPTION",
+        "ISSUED_MONTH_KZT",
+        "RATE_PERCENTAGE",
+        "PERIOD",
+    ),
+    link_include="Кредиты банковского сектора экономике",
+    layout=SheetLayout(
+        sheet="выдано",
+        period_row=3,
+        period_format="mm.yy",
+        data_start=4,
+        offsets=(("nat", 1), ("for", 2)),
+    ),
+    rules=(
+        CellRule(
+            2,
+            Label("всего кредиты выданные"),
+            Label("nat", exact=True),
+            "Всего в национальной валюте",
+        ),
+        CellRule(
+            3,
+            Label("всего кредиты выданные"),
+            Label("for", exact=True),
+            "Всего в иностранной валюте",
+        ),
+        CellRule(
+            4,
+            Label("малого предпринимательства"),
+            Label("nat", exact=True),
+            "В нац. валюте, малое предпринимательство",
+        ),
+        CellRule(
+            5,
+            Label("среднего предпринимательства"),
+            Label("nat", exact=True),
+            "В нац. валюте, среднее предпринимательство",
+        ),
+        CellRule(
+            6,
+            Label("крупного предпринимательства"),
+            Label("nat", exact=True),
+            "В нац. валюте, крупное предпринимательство",
+        ),
+        CellRule(
+            7,
+            Label("малого предпринимательства"),
+            Label("for", exact=True),
+            "В ин. валюте, малое предпринимательство",
+        ),
+        CellRule(
+            8,
+            Label("среднего предпринимательства"),
+            Label("for", exact=True),
+            "В ин. валюте, среднее предпринимательство",
+        ),
+        CellRule(
+            9,
+            Label("крупного предпринимательства"),
+            Label("for", exact=True),
+            "В ин. валюте, крупное предпринимательство",
+        ),
+    ),
+    totals=(Total(1, "Всего", (2, 3)),),
+    rates=RateLayout(
+        sheet="ставк",
+        period_row=3,
+        currency_row=4,
+        value_row=5,
+        national_marker="нац",
+        national_types=(2, 4, 5, 6),
+        foreign_types=(3, 7, 8, 9),
+    ),
+)
+
+MANUFACTURING = ReportSpec(
+    name="manufacturing",
+    table="DWH.D_LENDING_MANUFACTURING_BVU_RK",
+    # table="SANDBOX.D_LENDING_MANUFACTURING_BVU_RK",
+    value_col="ISSUED_LOAN_SUM",
+    columns=(
+        "LOAD_DATE",
+        "TYPE",
+        "TYPE_DESCRIPTION",
+        "PERIOD",
+        "PERIOD_TYPE",
+        "ISSUED_LOAN_SUM",
+        "PACKAGE_ID",
+    ),
+    link_include=(
+        "Кредиты банковского сектора субъектам предпринимательства "
+        "по видам экономической деятельности"
+    ),
+    rubrics=rubrics(2204, 1985, 1907, 2319),
+    layout=SheetLayout(
+        sheet="выдано",
+        period_row=3,
+        period_format="mm.yy",
+        data_start=5,
+        key_rows=(4,),
+        skip_prefixes=("за",),
+    ),
+    rules=tuple(
+        CellRule(type_id, Label(industry, exact=True), Label("сумма", exact=True))
+        for type_id, industry in {
+            1: "обрабатывающая промышленность",
+            2: "прочие отрасли промышленности",
+            3: "транспорт и складирование",
+            4: "информация и связь",
+        }.items()
+    ),
+    yearly=True,
+)
+
+APK = ReportSpec(
+    name="apk",
+    table="DWH.D_LENDING_APK_BVU_RK",
+    # table="SANDBOX.D_LENDING_APK_BVU_RK",
+    value_col="AGRICULTURAL_INDUSTRY",
+    columns=(
+        "LOAD_DATE",
+        "PACKAGE_ID",
+        "TYPE",
+        "TYPE_DESCRIPTION",
+        "AGRICULTURAL_INDUSTRY",
+        "PERIOD",
+        "PERIOD_TYPE",
+    ),
+    link_include="Кредиты банковского сектора субъектам предпринимательства",
+    rubrics=rubrics(1907, 1985, 2204, 2319),
+    link_exclude=(
+        "по видам экономической деятельности",
+        "по расширенной классификации",
+    ),
+    layout=SheetLayout(
+        sheet="выдано",
+        period_row=4,
+        period_format="month yyyy",
+        data_start=7,
+        key_rows=(5, 6),
+    ),
+    rules=tuple(
+        CellRule(type_id, Label("сельское"), Label(category, exact=True), category)
+        for type_id, category in {
+            2: "субъектам малого предпринимательства в национальной валюте",
+            3: "субъектам малого предпринимательства в иностранной валюте",
+            4: "субъектам среднего предпринимательства в национальной валюте",
+            5: "субъектам среднего предпринимательства в иностранной валюте",
+            6: "субъектам крупного предпринимательства в национальной валюте",
+            7: "субъектам крупного предпринимательства в иностранной валюте",
+        }.items()
+    ),
+    totals=(Total(1, "Всего", (2, 3, 4, 5, 6, 7)),),
+    fill_missing=0.0,
+    decimals=2,
+    yearly=True,
+)
+
+SPECS = {spec.name: spec for spec in (TOTAL, MANUFACTURING, APK)}
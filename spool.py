@@ -0,0 +1,102 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from config import loader_settings
+from filestore import read_json, update_json
+
+
+def spool_dir():
+    folder = Path(loader_settings.download_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder
+
+
+def _index_path():
+    return spool_dir() / "urls.json"
+
+
+def _entry(url):
+    """Запись индекса загрузок по url, если её файл ещё на месте."""
+    entry = read_json(_index_path()).get(url)
+    if entry and (spool_dir() / entry["file"]).exists():
+        return entry
+    return None
+
+
+def cached_report(url):
+    """Файл отчёта, скачанный по url сегодня, или None."""
+    entry = _entry(url)
+    if not entry or entry.get("date") != datetime.now().strftime("%Y-%m-%d"):
+        return None
+    return spool_dir() / entry["file"]
+
+
+def conditional_headers(url):
+    """If-None-Match/If-Modified-Since по последней загрузке url."""
+    entry = _entry(url) or {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def reuse_cached(url):
+    """Файл прошлой загрузки url после ответа 304 Not Modified."""
+    entry = _entry(url)
+    if entry is None:
+        return None
+    path = spool_dir() / entry["file"]
+    remember(url, path, entry["etag"], entry["last_modified"])
+    return path
+
+
+def remember(url, path, etag=None, last_modified=None):
+    """Запоминает файл и валидаторы (ETag, Last-Modified) загрузки url.
+
+    Индекс общий для всех процессов (см. filestore.update_json).
+    """
+    entry = {
+        "file": path.name,
+        "date": datetime.now().strftime("%Y-%m-%d"),
+        "etag": etag,
+        "last_modified": last_modified,
+    }
+    update_json(_index_path(), lambda index: {**index, url: entry})
+
+
+def spool_response(resp, url, suffix=".xlsx"):
+    """Потоково сохраняет ответ в spool-каталог и возвращает путь к файлу.
+
+    Файл называется по SHA-256 содержимого, поэтому одинаковые отчёты
+    хранятся один раз. Пока отчёт не превышает spool_ram_budget, он
+    буферизуется в памяти, дальше — во временном файле на диске.
+    """
+    folder = spool_dir()
+    digest = hashlib.sha256()
+    chunk_size = loader_settings.download_chunk_size
+    with tempfile.SpooledTemporaryFile(
+        max_size=loader_settings.spool_ram_budget, dir=folder
+    ) as buffer:
+        for chunk in resp.iter_content(chunk_size):
+            digest.update(chunk)
+            buffer.write(chunk)
+
+        path = folder / f"{digest.hexdigest()}{suffix}"
+        if not path.exists():
+            buffer.seek(0)
+            part = path.with_name(
+                f"{path.name}.{os.getpid()}_{threading.get_ident()}.part"
+            )
+            with open(part, "wb") as f:
+                shutil.copyfileobj(buffer, f, chunk_size)
+            os.replace(part, path)
+
+    remember(url, path, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+    return path
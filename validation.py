@@ -0,0 +1,170 @@
+import logging
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from config import loader_settings
+
+logger = logging.getLogger(__name__)
+
+ISSUE_COLUMNS = ["PERIOD", "CHECK", "DETAIL"]
+# Проверки, которые только попадают в отчёт и не отправляют период на карантин
+REPORT_ONLY = {"continuity"}
+
+
+def _issues(mask, check, detail):
+    """Строки проверки для периодов, где mask (Series по PERIOD) истинна."""
+    failed = mask[mask]
+    return pd.DataFrame(
+        {
+            "PERIOD": failed.index,
+            "CHECK": check,
+            "DETAIL": detail(failed.index) if callable(detail) else detail,
+        },
+        columns=ISSUE_COLUMNS,
+    )
+
+
+def check_continuity(periods):
+    months = pd.PeriodIndex(pd.to_datetime(periods), freq="M").unique()
+    missing = pd.period_range(months.min(), months.max(), freq="M").difference(months)
+    return pd.DataFrame(
+        {
+            "PERIOD": missing.to_timestamp(how="end").strftime("%Y-%m-%d"),
+            "CHECK": "continuity",
+            "DETAIL": "нет данных за период",
+        },
+        columns=ISSUE_COLUMNS,
+    )
+
+
+def check_completeness(wide, expected):
+    missing = wide.reindex(columns=expected).isna()
+    return _issues(
+        missing.any(axis=1),
+        "completeness",
+        lambda index: [
+            "нет TYPE " + ", ".join(map(str, missing.columns[missing.loc[p]]))
+            for p in index
+        ],
+    )
+
+
+def check_rates(months, rates):
+    low, high = rates.valid_range
+    rate = months[rates.column]
+    bad = (rate < low) | (rate > high)
+    return _issues(
+        bad.groupby(months["PERIOD"]).any(),
+        "rate_range",
+        f"ставка вне диапазона [{low}, {high}]",
+    )
+
+
+def check_outliers(wide, ratio):
+    """Отрицательные значения и скачки к предыдущему месяцу более чем в ratio раз."""
+    previous = wide.shift(1)
+    change = wide / previous
+    jump = (previous > 0) & (wide > 0) & ((change > ratio) | (change < 1 / ratio))
+    negative = wide < 0
+    return [
+        _issues(negative.any(axis=1), "negative", "отрицательное значение"),
+        _issues(
+            jump.any(axis=1),
+            "outlier",
+            lambda index: [
+                "скачок TYPE " + ", ".join(map(str, wide.columns[jump.loc[p]]))
+                for p in index
+            ],
+        ),
+    ]
+
+
+def _accepted_path():
+    return Path(loader_settings.quarantine_dir) / "accepted.csv"
+
+
+def accepted_issues(name):
+    """Проблемы витрины (PERIOD, CHECK), принятые вручную: не ведут к карантину."""
+    path = _accepted_path()
+    if not path.exists():
+        return pd.DataFrame(columns=["PERIOD", "CHECK"])
+    accepted = pd.read_csv(path, dtype=str, encoding="utf-8-sig")
+    return accepted.loc[accepted["MART"] == name, ["PERIOD", "CHECK"]]
+
+
+def accept_issue(name, period, check):
+    """Добавляет проблему в accepted.csv (например, реальный скачок значений)."""
+    path = _accepted_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    row = pd.DataFrame({"MART": [name], "PERIOD": [period], "CHECK": [check]})
+    row.to_csv(
+        path, mode="a", header=not path.exists(), index=False, encoding="utf-8-sig"
+    )
+    logger.info(f"[{name}] Принято: {period} {check}")
+
+
+def validate(spec, df):
+    """Проверяет итоговый набор витрины перед загрузкой.
+
+    Возвращает (годные строки, строки на карантине, найденные проблемы).
+    Период с ошибкой уходит на карантин целиком вместе с годовым итогом
+    своего года; пропуски периодов и проблемы из accepted.csv только
+    попадают в отчёт.
+    """
+    if df.empty:
+        return df, df, pd.DataFrame(columns=ISSUE_COLUMNS)
+
+    is_month = (
+        df["PERIOD_TYPE"] == "month"
+        if "PERIOD_TYPE" in df
+        else pd.Series(True, index=df.index)
+    )
+    months = df[is_month]
+    wide = months.pivot_table(
+        index="PERIOD", columns="TYPE", values=spec.value_col, aggfunc="first"
+    ).sort_index()
+    expected = sorted(
+        {rule.type_id for rule in spec.rules} | {t.type_id for t in spec.totals}
+    )
+
+    frames = [
+        check_continuity(months["PERIOD"]),
+        check_completeness(wide, expected),
+        *check_outliers(wide, loader_settings.outlier_ratio),
+    ]
+    if spec.rates:
+        frames.append(check_rates(months, spec.rates))
+    issues = pd.concat(frames, ignore_index=True).sort_values("PERIOD")
+
+    keys = pd.MultiIndex.from_arrays([issues["PERIOD"].astype(str), issues["CHECK"]])
+    accepted = pd.MultiIndex.from_frame(accepted_issues(spec.name))
+    reported = issues["CHECK"].isin(REPORT_ONLY) | keys.isin(accepted)
+    failed = issues.loc[~reported, "PERIOD"].unique()
+    failed_years = pd.Series(failed, dtype=str).str[:4].unique()
+    quarantined = df["PERIOD"].isin(failed) | (
+        ~is_month & df["PERIOD"].astype(str).str[:4].isin(failed_years)
+    )
+    for row, is_reported in zip(issues.itertuples(index=False), reported):
+        status = "" if is_reported else " (карантин)"
+        logger.warning(f"[{spec.name}] {row.PERIOD} {row.CHECK}: {row.DETAIL}{status}")
+    return df[~quarantined], df[quarantined], issues
+
+
+def save_quarantine(spec, rows, issues):
+    """Пишет строки на карантине вместе с причинами в quarantine_dir (CSV)."""
+    folder = Path(loader_settings.quarantine_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    reasons = (
+        (issues["CHECK"] + ": " + issues["DETAIL"])
+        .groupby(issues["PERIOD"])
+        .agg("; ".join)
+        .rename("REASON")
+    )
+    path = folder / f"{spec.name}_{datetime.now():%Y%m%d_%H%M%S}.csv"
+    rows.merge(reasons, left_on="PERIOD", right_index=True, how="left").to_csv(
+        path, index=False, encoding="utf-8-sig"
+    )
+    logger.warning(f"[{spec.name}] На карантине {len(rows)} строк: {path}")
+    return path